@@ -1,29 +1,96 @@
-import platform
+import concurrent.futures
+import functools
 import os
-import shutil
-import pandas as pd
-import matplotlib.pyplot as plt
+import re
 import json
+try:
+    import orjson # Optional C-accelerated JSON; the stdlib json module is used without it
+except ImportError:
+    orjson = None
 import logging
+import logging.handlers
+import queue
 import requests
-from datetime import datetime, timedelta
-import pytz
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
 
 # Setup logging
-EASTERN_TZ = pytz.timezone('US/Eastern')
+EASTERN_TZ = ZoneInfo('US/Eastern')
+
+# Check threads only enqueue log records. A listener thread batches them into the
+# file (flushed every 1000 records, on any ERROR, and when main() finishes).
+_log_queue = queue.SimpleQueue()
+_log_file_handler = logging.FileHandler('monitor.log')
+_log_file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+_log_buffer = logging.handlers.MemoryHandler(capacity=1000, flushLevel=logging.ERROR, target=_log_file_handler)
+LOG_LISTENER = logging.handlers.QueueListener(_log_queue, _log_buffer)
 
 logging.basicConfig(
-    filename='monitor.log',
+    handlers=[logging.handlers.QueueHandler(_log_queue)],
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+    format='%(message)s' # Final formatting happens in the file handler
 )
 
 # --- Configuration ---
 TARGETS_FILE = "monitoring_targets.txt"
-RESULTS_FILE = "docs/data/results.json"
+RESULTS_FILE = "docs/data/results.jsonl"
+LEGACY_RESULTS_FILE = "docs/data/results.json" # Pre-JSONL history, migrated on first run
 HISTORY_DAYS = 30 # Number of days of history to keep
+CHART_DPI = 100 # 10in wide figure -> 1000px PNG, plenty for the dashboard cards
+PRUNE_INTERVAL_DAYS = 7 # How far past the cutoff old entries may linger before the file is rewritten
+REQUEST_TIMEOUT = 10 # Seconds to wait for each target to respond
+HEAD_FALLBACK_CODES = (403, 405, 501) # Statuses that mean "HEAD not supported here"
+POOL_SIZE = 64 # Max pooled keep-alive connections, shared by all check threads
+
+# Shared HTTP session so checks reuse pooled TCP/TLS connections.
+# No transport retries: a hung host would otherwise hold its check for several
+# REQUEST_TIMEOUTs plus backoff, and the run lasts as long as its slowest check.
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=POOL_SIZE,
+    pool_maxsize=POOL_SIZE,
+    max_retries=Retry(total=0)
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
 
 # --- Helper Functions ---
+_SANITIZE_RE = re.compile(r'[^0-9A-Za-z]')
+
+def _sanitize(name):
+    """Replaces every non-alphanumeric character with '_' so a resource name can be used in file names."""
+    return _SANITIZE_RE.sub('_', name)
+
+def _atomic_write_bytes(path, data):
+    """
+    Writes bytes to a temp file with a single os.write() and renames it over path,
+    so readers (and the Pages deploy) never see a half-written file.
+    Raises OSError on failure.
+    """
+    tmp_path = f"{path}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view: # os.write may accept fewer bytes than requested
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+
+def _decode_json(data):
+    """Parses a JSON document from bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _encode_json_line(entry):
+    """Serializes one record as a newline-terminated JSON Lines row (bytes)."""
+    if orjson is not None:
+        return orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+
 def read_targets(file_path):
     """
     Reads a list of targets from a text file.
@@ -51,83 +118,166 @@ def read_targets(file_path):
         logging.error(f"'{file_path}' not found. Using default targets.")
         return [("Google", "google.com"), ("GitHub", "github.com")]
 
-def load_historical_data(file_path):
-    """Loads historical monitoring data from a JSON file."""
-    if os.path.exists(file_path):
-        try:
-            with open(file_path, "r") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
-            logging.error(f"Could not read or parse '{file_path}': {e}. Starting fresh.")
-            return []
-    return []
-
-def save_and_prune_data(data, file_path, days_to_keep):
-    """Appends new data, prunes old entries, and saves to a JSON file."""
-    cutoff_date = datetime.now(EASTERN_TZ) - timedelta(days=days_to_keep)
-    pruned_data = [
-        entry for entry in data
-        if datetime.fromisoformat(entry['timestamp']) > cutoff_date
-    ]
+def migrate_legacy_results(legacy_path, file_path):
+    """Converts the old single-document JSON history into the JSON-Lines results file."""
+    if os.path.exists(file_path) or not os.path.exists(legacy_path):
+        return
+    try:
+        with open(legacy_path, "rb") as f:
+            legacy_data = _decode_json(f.read())
+    except (json.JSONDecodeError, IOError) as e:
+        logging.error(f"Could not read or parse '{legacy_path}': {e}. Skipping migration.")
+        return
+    # The legacy file mixes UTC and Eastern offsets and is not strictly in time order.
+    # Sort it and restamp it in the run format (UTC, second precision), since pruning and
+    # charting rely on records being in time order with string-comparable timestamps.
+    try:
+        for entry in legacy_data:
+            entry['timestamp'] = datetime.fromisoformat(entry['timestamp']).astimezone(timezone.utc)
+    except (KeyError, TypeError, ValueError) as e:
+        logging.error(f"Could not parse timestamps in '{legacy_path}': {e}. Skipping migration.")
+        return
+    legacy_data.sort(key=lambda entry: entry['timestamp'])
+    for entry in legacy_data:
+        entry['timestamp'] = entry['timestamp'].isoformat(timespec='seconds')
+    if write_results(legacy_data, file_path):
+        os.remove(legacy_path)
+        logging.info(f"Migrated {len(legacy_data)} data points from '{legacy_path}' to '{file_path}'.")
+
+def iter_historical_data(file_path):
+    """Yields historical monitoring records from a JSON-Lines file, one per line."""
+    if not os.path.exists(file_path):
+        return
+    try:
+        with open(file_path, "rb") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield _decode_json(line)
+                except json.JSONDecodeError as e:
+                    logging.warning(f"Skipping unreadable line {line_number} in '{file_path}': {e}")
+    except IOError as e:
+        logging.error(f"Could not read '{file_path}': {e}. Starting fresh.")
+
+def append_results(results, file_path):
+    """Appends new monitoring records to the JSON-Lines results file."""
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    try:
+        with open(file_path, "ab") as f:
+            f.write(b"".join(_encode_json_line(entry) for entry in results))
+        logging.info(f"Appended {len(results)} data points to '{file_path}'.")
+    except IOError as e:
+        logging.error(f"Could not append to '{file_path}': {e}")
+
+def write_results(data, file_path):
+    """Atomically replaces the JSON-Lines results file with the given records."""
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
     try:
-        with open(file_path, "w") as f:
-            json.dump(pruned_data, f, indent=2)
-        logging.info(f"Saved {len(pruned_data)} data points to '{file_path}'.")
+        _atomic_write_bytes(file_path, b"".join(_encode_json_line(entry) for entry in data))
+        logging.info(f"Saved {len(data)} data points to '{file_path}'.")
+        return True
     except IOError as e:
         logging.error(f"Could not write to '{file_path}': {e}")
+        return False
+
+def prune_results(data, file_path, days_to_keep, prune_interval_days):
+    """
+    Drops entries older than the retention window and rewrites the results file.
+    The rewrite only happens once the oldest entry is a full interval past the
+    cutoff, so most runs never touch more than the appended lines.
+    Returns the (possibly pruned) data.
+    """
+    if not data:
+        return data
+    cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_to_keep)
+    # Records are appended in time order, so the first one is the oldest. Run timestamps are
+    # UTC ISO strings, so a string compare is enough to decide whether a rewrite is due.
+    if data[0]['timestamp'] > (cutoff_date - timedelta(days=prune_interval_days)).isoformat():
+        return data
+    import pandas as pd
+
+    # Parse every timestamp in one vectorized call instead of a fromisoformat per entry
+    timestamps = pd.to_datetime([entry['timestamp'] for entry in data], format='ISO8601', utc=True)
+    keep_mask = timestamps > pd.Timestamp(cutoff_date)
+    pruned_data = [entry for entry, keep in zip(data, keep_mask) if keep]
+    write_results(pruned_data, file_path)
     return pruned_data
 
 # --- Core Logic ---
+def check_target(target_host, timestamp):
+    """Checks a single target over HTTPS and returns its result record stamped with the run's timestamp."""
+    logging.info(f"Checking {target_host}...")
+    status = "Down"
+    try:
+        # Add "https://" if no scheme is present
+        if not target_host.startswith(('http://', 'https://')):
+            url_to_check = f"https://{target_host}"
+        else:
+            url_to_check = target_host
+
+        # HEAD avoids downloading the page body; fall back to GET for servers that refuse it
+        response = SESSION.head(url_to_check, timeout=REQUEST_TIMEOUT, allow_redirects=True)
+        if response.status_code in HEAD_FALLBACK_CODES:
+            response = SESSION.get(url_to_check, timeout=REQUEST_TIMEOUT, stream=True)
+            response.close() # Only the status line is needed, so skip reading the body
+        if response.status_code >= 200 and response.status_code < 300:
+            status = "Up"
+            logging.info(f"Check for {target_host} SUCCEEDED with status code {response.status_code}.")
+        else:
+            logging.warning(f"Check for {target_host} FAILED with status code {response.status_code}.")
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Check for {target_host} failed with an exception: {e}")
+
+    return {
+        "resource": target_host,
+        "status": status,
+        "timestamp": timestamp
+    }
+
 def main():
     """Main function to run the monitoring process."""
-    targets = read_targets(TARGETS_FILE)
-    historical_data = load_historical_data(RESULTS_FILE)
-
-    current_results = []
-    target_urls = [url for _, url in targets]
-
-    for target_host in target_urls:
-        logging.info(f"Checking {target_host}...")
-        status = "Down"
-        try:
-            # Add "https://" if no scheme is present
-            if not target_host.startswith(('http://', 'https://')):
-                url_to_check = f"https://{target_host}"
-            else:
-                url_to_check = target_host
-
-            response = requests.get(url_to_check, timeout=10)
-            if response.status_code >= 200 and response.status_code < 300:
-                status = "Up"
-                logging.info(f"Check for {target_host} SUCCEEDED with status code {response.status_code}.")
-            else:
-                logging.warning(f"Check for {target_host} FAILED with status code {response.status_code}.")
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Check for {target_host} failed with an exception: {e}")
-
-        current_results.append({
-            "resource": target_host,
-            "status": status,
-            "timestamp": datetime.now(EASTERN_TZ).isoformat()
-        })
-
-    combined_data = historical_data + current_results
-    pruned_data = save_and_prune_data(combined_data, RESULTS_FILE, HISTORY_DAYS)
-
-    generate_chart(pruned_data, target_urls)
-    generate_html_report(pruned_data, targets)
+    LOG_LISTENER.start()
+    try:
+        targets = read_targets(TARGETS_FILE)
+        migrate_legacy_results(LEGACY_RESULTS_FILE, RESULTS_FILE)
+        historical_data = list(iter_historical_data(RESULTS_FILE))
+
+        target_urls = [url for _, url in targets]
+        # File-safe names are computed once and shared by the chart and report writers
+        sanitized_names = {url: _sanitize(url) for url in target_urls}
+
+        # Every record from this run shares one UTC timestamp. A single fixed offset keeps
+        # ISO strings in chronological order, and the charts and report convert to ET for display.
+        run_timestamp = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(32, len(target_urls))) as executor:
+            current_results = list(executor.map(functools.partial(check_target, timestamp=run_timestamp), target_urls))
+
+        append_results(current_results, RESULTS_FILE)
+        pruned_data = prune_results(historical_data + current_results, RESULTS_FILE, HISTORY_DAYS, PRUNE_INTERVAL_DAYS)
+
+        generate_chart(pruned_data, target_urls, sanitized_names)
+        generate_html_report(pruned_data, targets, sanitized_names)
+    finally:
+        # Drain the queue, then push anything still buffered out to the file
+        LOG_LISTENER.stop()
+        _log_buffer.flush()
 
 # --- Output Generation ---
-def generate_chart(all_data, target_urls):
+def generate_chart(all_data, target_urls, sanitized_names):
     """Generates a heatmap-style grid chart for each resource's hourly uptime."""
     if not all_data:
         logging.warning("No data available to generate charts.")
         return
 
+    # pandas and Matplotlib are only imported once there is something to draw
+    import pandas as pd
+    import matplotlib
+    matplotlib.use('Agg') # Render straight to files; skip interactive backend detection
+    import matplotlib.pyplot as plt
     from matplotlib.colors import ListedColormap
     import matplotlib.patches as mpatches
-    import numpy as np
 
     df = pd.DataFrame(all_data)
     df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601', utc=True).dt.tz_convert('US/Eastern')
@@ -135,109 +285,114 @@ def generate_chart(all_data, target_urls):
     df['hour'] = df['timestamp'].dt.hour
     # Map status to numerical values for plotting: 2 for Up, 1 for Down. Missing data will be 0.
     status_map = {'Up': 2, 'Down': 1}
-    df['status_val'] = df['status'].map(status_map)
+    df['status_val'] = df['status'].map(status_map).fillna(0).astype('int8')
 
-    for resource_url in target_urls:
-        try:
-            resource_df = df[df['resource'] == resource_url]
-            sanitized_name = "".join(c if c.isalnum() else '_' for c in resource_url)
-            chart_path = f"docs/chart_{sanitized_name}.png"
-
-            if resource_df.empty:
-                logging.warning(f"No data for {resource_url}, skipping chart generation.")
-                continue
-
-            # --- Data Preparation for Grid ---
-            end_date = datetime.now(EASTERN_TZ).date()
-            start_date = end_date - timedelta(days=HISTORY_DAYS - 1)
-
-            # Create a complete hourly timeline scaffold
-            now_et = datetime.now(EASTERN_TZ)
-            start_ts = pd.Timestamp(start_date, tz='US/Eastern')
-            end_ts = pd.Timestamp(end_date, tz='US/Eastern').replace(hour=23)
-            hourly_range = pd.date_range(start=start_ts, end=end_ts, freq='h')
-            scaffold_df = pd.DataFrame({'timestamp': hourly_range})
-            scaffold_df['date'] = scaffold_df['timestamp'].dt.date
-            scaffold_df['hour'] = scaffold_df['timestamp'].dt.hour
-
-            # Get the last known status for each hour from the actual data
-            hourly_status = resource_df.sort_values('timestamp').drop_duplicates(['date', 'hour'], keep='last')
-
-            # Merge the scaffold with the actual data. This introduces NaNs for all missing hours.
-            merged_df = pd.merge(scaffold_df, hourly_status[['date', 'hour', 'status_val']], on=['date', 'hour'], how='left')
-
-            # Differentiate between past and future missing data
-            # Fill past missing hours with 0 (Missing). Future hours remain NaN.
-            merged_df.loc[merged_df['timestamp'] < now_et, 'status_val'] = merged_df.loc[merged_df['timestamp'] < now_et, 'status_val'].fillna(0)
-
-            # Pivot to create the grid
-            grid_df = merged_df.pivot_table(index='hour', columns='date', values='status_val')
-
-            # Reindex to ensure column order and preserve NaNs for the future
-            date_range = pd.date_range(start=start_date, end=end_date, freq='D').date
-            grid_df = grid_df.reindex(index=range(24), columns=date_range)
-
-            # --- Plotting ---
-            fig, ax = plt.subplots(figsize=(10, 5))
-            # Grey for missing (0), Red for Down (1), Green for Up (2). White for future (NaN).
-            cmap = ListedColormap(['#8E8E8E', '#0021A5', '#FA4616'])
-            cmap.set_bad(color='white') # Use white for NaN values (the future)
-
-            ax.imshow(grid_df, cmap=cmap, aspect='auto', interpolation='nearest', vmin=0, vmax=2)
-
-            # --- Legend ---
-            patches = [
-                mpatches.Patch(color='#FA4616', label='Up'),
-                mpatches.Patch(color='#0021A5', label='Down'),
-                mpatches.Patch(color='#8E8E8E', label='Missing')
-#                ,mpatches.Patch(color='white', label='Future', edgecolor='black')
-            ]
-            ax.legend(handles=patches, bbox_to_anchor=(1.05, 1), loc='upper left', borderaxespad=0.)
-
-            # --- Axes and Labels ---
-            ax.set_title(f'Hourly Uptime: {resource_url} (Last 30 Days)', fontsize=12)
-
-            # Y-axis (Hours)
-            ax.set_ylabel('Hour of Day (ET)', fontsize=10)
-            ax.set_yticks(range(0, 24, 4))
-            ax.set_yticklabels([f'{h:02d}:00' for h in range(0, 24, 4)])
-
-            # X-axis (Dates)
-            ax.set_xlabel('Date', fontsize=10)
-            # Display ticks for every 5 days for clarity
-            tick_indices = np.arange(0, len(date_range), 5)
-            ax.set_xticks(tick_indices)
-            ax.set_xticklabels([date_range[i].strftime('%b %d') for i in tick_indices], rotation=45, ha="right")
-
-            # Add grid lines to create separation between blocks
-            ax.set_xticks(np.arange(-.5, len(date_range), 1), minor=True)
-            ax.set_yticks(np.arange(-.5, 24, 1), minor=True)
-            ax.grid(which="minor", color="w", linestyle='-', linewidth=2)
-            ax.tick_params(which="minor", size=0)
-
-            # Invert y-axis to have hour 0 at the top
-            ax.invert_yaxis()
-
-            plt.tight_layout(rect=[0, 0, 0.85, 1]) # Adjust layout to make space for legend
-            plt.savefig(chart_path, dpi=150, bbox_inches='tight')
-            plt.close(fig)
-            logging.info(f"Generated heatmap chart for {resource_url} at {chart_path}")
-
-        except Exception as e:
-            logging.error(f"Failed to generate heatmap chart for {resource_url}: {e}", exc_info=True)
-
-
-def generate_html_report(all_data, current_targets):
-    """Generates a static HTML report from the latest monitoring data."""
-    latest_status_map = {}
-    for entry in sorted(all_data, key=lambda x: x['timestamp'], reverse=True):
-        if entry['resource'] not in latest_status_map:
-            latest_status_map[entry['resource']] = entry
+    # Split the frame by resource once instead of scanning it for every target
+    resource_groups = dict(iter(df.groupby('resource', sort=False)))
+
+    # Grey for missing (0), Red for Down (1), Green for Up (2). White for future (NaN).
+    cmap = ListedColormap(['#8E8E8E', '#0021A5', '#FA4616'])
+    cmap.set_bad(color='white') # Use white for NaN values (the future)
+
+    patches = [
+        mpatches.Patch(color='#FA4616', label='Up'),
+        mpatches.Patch(color='#0021A5', label='Down'),
+        mpatches.Patch(color='#8E8E8E', label='Missing')
+#        ,mpatches.Patch(color='white', label='Future', edgecolor='black')
+    ]
+
+    # One reference time for every chart, so date columns and the past/future split always agree
+    now_et = datetime.now(EASTERN_TZ)
+    start_date = now_et.date() - timedelta(days=HISTORY_DAYS - 1)
+    date_range = pd.date_range(start=start_date, end=now_et.date(), freq='D').date
 
-    def sanitize_resource_name(name):
-        return "".join(c if c.isalnum() else '_' for c in name)
+    # One figure is reused for every chart; building a new one per target is the expensive part
+    fig, ax = plt.subplots(figsize=(10, 5))
+    # Fixed margins leave room for the legend on the right; cheaper than tight_layout + bbox_inches='tight' per save
+    fig.subplots_adjust(left=0.08, right=0.82, top=0.92, bottom=0.15)
+    try:
+        for resource_url in target_urls:
+            _render_chart(
+                fig, ax, resource_groups.get(resource_url), resource_url, sanitized_names[resource_url],
+                now_et, date_range, cmap, patches
+            )
+    finally:
+        plt.close(fig)
+
+def _render_chart(fig, ax, resource_df, resource_url, sanitized_name, now_et, date_range, cmap, patches):
+    """Draws one resource's hourly heatmap onto the shared axes and saves it as a PNG."""
+    import numpy as np
 
-    html = """
+    try:
+        chart_path = f"docs/chart_{sanitized_name}.png"
+
+        if resource_df is None or resource_df.empty:
+            logging.warning(f"No data for {resource_url}, skipping chart generation.")
+            return
+
+        # --- Data Preparation for Grid ---
+        start_date = date_range[0]
+
+        # Get the last known status for each hour from the actual data.
+        # Records are appended in time order, so hash grouping can take the last row without sorting.
+        hourly_status = resource_df.groupby(['date', 'hour'], as_index=False, sort=False).agg({'status_val': 'last'})
+
+        # Scatter each (date, hour) status straight into a fixed 24 x HISTORY_DAYS grid.
+        # Cells without data stay NaN.
+        days = (hourly_status['date'].values.astype('datetime64[D]') - np.datetime64(start_date)).astype(int)
+        hours = hourly_status['hour'].values
+        in_window = (days >= 0) & (days < HISTORY_DAYS)
+        grid = np.full((24, HISTORY_DAYS), np.nan, dtype=np.float32)
+        grid[hours[in_window], days[in_window]] = hourly_status['status_val'].values[in_window]
+
+        # Differentiate between past and future missing data
+        # Fill past missing hours with 0 (Missing). Future hours remain NaN.
+        past = np.zeros_like(grid, dtype=bool)
+        past[:, :HISTORY_DAYS - 1] = True
+        past[:now_et.hour + 1, HISTORY_DAYS - 1] = True
+        grid[past & np.isnan(grid)] = 0
+
+        # --- Plotting ---
+        ax.cla()
+        ax.imshow(grid, cmap=cmap, aspect='auto', interpolation='nearest', vmin=0, vmax=2)
+
+        # --- Legend ---
+        ax.legend(handles=patches, bbox_to_anchor=(1.05, 1), loc='upper left', borderaxespad=0.)
+
+        # --- Axes and Labels ---
+        ax.set_title(f'Hourly Uptime: {resource_url} (Last 30 Days)', fontsize=12)
+
+        # Y-axis (Hours)
+        ax.set_ylabel('Hour of Day (ET)', fontsize=10)
+        ax.set_yticks(range(0, 24, 4))
+        ax.set_yticklabels([f'{h:02d}:00' for h in range(0, 24, 4)])
+
+        # X-axis (Dates)
+        ax.set_xlabel('Date', fontsize=10)
+        # Display ticks for every 5 days for clarity
+        tick_indices = np.arange(0, len(date_range), 5)
+        ax.set_xticks(tick_indices)
+        ax.set_xticklabels([date_range[i].strftime('%b %d') for i in tick_indices], rotation=45, ha="right")
+
+        # Add grid lines to create separation between blocks
+        ax.set_xticks(np.arange(-.5, len(date_range), 1), minor=True)
+        ax.set_yticks(np.arange(-.5, 24, 1), minor=True)
+        ax.grid(which="minor", color="w", linestyle='-', linewidth=2)
+        ax.tick_params(which="minor", size=0)
+
+        # Invert y-axis to have hour 0 at the top
+        ax.invert_yaxis()
+
+        fig.savefig(chart_path, dpi=CHART_DPI)
+        logging.info(f"Generated heatmap chart for {resource_url} at {chart_path}")
+
+    except Exception as e:
+        logging.error(f"Failed to generate heatmap chart for {resource_url}: {e}", exc_info=True)
+
+
+# --- HTML Templates ---
+# Static page pieces are built once at import; generate_html_report only fills in the dynamic parts.
+HTML_HEADER = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -269,37 +424,16 @@ def generate_html_report(all_data, current_targets):
 <body>
     <h1>System Status</h1>
 """
-    last_checked = "N/A"
-    if all_data:
-        try:
-            latest_timestamp = max(datetime.fromisoformat(d['timestamp']) for d in all_data)
-            last_checked = latest_timestamp.astimezone(EASTERN_TZ).strftime('%Y-%m-%d %H:%M:%S ET')
-        except (ValueError, TypeError):
-             last_checked = "Error parsing date"
-    else:
-        last_checked = datetime.now(EASTERN_TZ).strftime('%Y-%m-%d %H:%M:%S ET')
-
-    html += f"<h2>Last Checked: {last_checked}</h2>"
-    html += '<div class="service-grid">'
-
-    for display_name, resource_url in current_targets:
-        latest_data = latest_status_map.get(resource_url)
-        status = latest_data.get('status', 'Unknown') if latest_data else "Unknown"
-        sanitized_name = sanitize_resource_name(resource_url)
-        chart_path = f"chart_{sanitized_name}.png"
-        status_class = status.lower()
 
-        html += f"""
+SERVICE_CARD_TEMPLATE = """
     <div class="service">
         <h3>{display_name}</h3>
         <p><strong>Status:</strong> <span class="{status_class}">{status}</span></p>
         <img src="{chart_path}" alt="{display_name} Uptime Chart">
     </div>
 """
-    html += '</div>'
 
-    # Add the static footer
-    html += """
+HTML_FOOTER = """
 <div class="footer">
     <div class="footer-cell">
         <h3>Salesforce</h3>
@@ -310,13 +444,48 @@ def generate_html_report(all_data, current_targets):
         <a href="https://status.snowflake.com/" target="_blank">Snowflake up status</a>
     </div>
 </div>
-"""
+</body></html>"""
 
-    html += '</body></html>'
+def generate_html_report(all_data, current_targets, sanitized_names):
+    """Generates a static HTML report from the latest monitoring data."""
+    # Single pass: keep the newest entry per resource (ISO timestamps compare as strings)
+    latest_status_map = {}
+    for entry in all_data:
+        current = latest_status_map.get(entry['resource'])
+        if current is None or entry['timestamp'] > current['timestamp']:
+            latest_status_map[entry['resource']] = entry
+
+    parts = [HTML_HEADER]
+    last_checked = "N/A"
+    if all_data:
+        try:
+            # The newest entry overall is one of the per-resource latest entries; pick it by string and parse only that one
+            latest_timestamp = datetime.fromisoformat(max(d['timestamp'] for d in latest_status_map.values()))
+            last_checked = latest_timestamp.astimezone(EASTERN_TZ).strftime('%Y-%m-%d %H:%M:%S ET')
+        except (ValueError, TypeError):
+             last_checked = "Error parsing date"
+    else:
+        last_checked = datetime.now(EASTERN_TZ).strftime('%Y-%m-%d %H:%M:%S ET')
+
+    parts.append(f"<h2>Last Checked: {last_checked}</h2>")
+    parts.append('<div class="service-grid">')
+
+    for display_name, resource_url in current_targets:
+        latest_data = latest_status_map.get(resource_url)
+        status = latest_data.get('status', 'Unknown') if latest_data else "Unknown"
+        chart_path = f"chart_{sanitized_names[resource_url]}.png"
+        status_class = status.lower()
+
+        parts.append(SERVICE_CARD_TEMPLATE.format(
+            display_name=display_name, status_class=status_class, status=status, chart_path=chart_path
+        ))
+    parts.append('</div>')
+
+    # Add the static footer
+    parts.append(HTML_FOOTER)
 
     try:
-        with open("docs/index.html", "w") as f:
-            f.write(html)
+        _atomic_write_bytes("docs/index.html", "".join(parts).encode("utf-8"))
         logging.info("Successfully generated HTML report at docs/index.html")
     except IOError as e:
         logging.error(f"Could not write HTML report: {e}")